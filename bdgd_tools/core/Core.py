@@ -9,26 +9,85 @@
  * Date: 22/03/2023
  * Time: 12:02
 """
+import functools
 import inspect
 import json
 import os.path
 import pathlib
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 import geopandas as gpd
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyogrio
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from bdgd_tools import Sample, Case, Circuit, LineCode
 from bdgd_tools.core.Utils import load_json
 from bdgd_tools.gui.GUI import GUI
 
+_ARROW_DTYPES = {
+    'float': 'float64[pyarrow]',
+    'int': 'int64[pyarrow]',
+    'str': 'string[pyarrow]',
+    'bool': 'bool[pyarrow]',
+    **{
+        dtype: f'{dtype}[pyarrow]'
+        for dtype in (
+            'float32', 'float64',
+            'int8', 'int16', 'int32', 'int64',
+            'uint8', 'uint16', 'uint32', 'uint64',
+        )
+    },
+}
+
+
+def _is_arrow_numeric(dtype):
+    """
+    Indica se o tipo é um tipo pyarrow inteiro ou de ponto flutuante.
+
+    :param dtype: Tipo de dados do pandas.
+    :return: True se ``dtype`` for um ``pd.ArrowDtype`` numérico.
+    """
+    return isinstance(dtype, pd.ArrowDtype) and (pa.types.is_integer(dtype.pyarrow_dtype)
+                                                 or pa.types.is_floating(dtype.pyarrow_dtype))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_json_cached(path, mtime):
+    """
+    Lê e interpreta o arquivo JSON, mantendo o resultado em cache.
+
+    A data de modificação faz parte da chave do cache, para que o arquivo seja lido novamente
+    quando for alterado.
+
+    :param path: Caminho do arquivo JSON.
+    :param mtime: Data de modificação do arquivo.
+    :return: Objeto Python contendo o conteúdo do arquivo JSON.
+    """
+    if orjson is not None:
+        with open(path, 'rb') as file:
+            return orjson.loads(file.read())
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
 
 class Table:
     def __init__(self, name, columns, data_types, ignore_geometry_):
         self.name = name
         self.columns = columns
         self.data_types = data_types
-        self.ignore_geometry = ignore_geometry_
+        # O JSON informa o valor como texto ("True"/"False"), que seria sempre verdadeiro como bool
+        self.ignore_geometry = ignore_geometry_ if isinstance(ignore_geometry_, bool) \
+            else str(ignore_geometry_).strip().lower() == 'true'
 
     def __str__(self):
         return f"Table(name={self.name}, columns={self.columns}, data_types={self.data_types}, " \
@@ -53,9 +112,7 @@ class JsonData:
         :param file_name: Nome do arquivo JSON de entrada.
         :return: Objeto Python contendo o conteúdo do arquivo JSON.
         """
-        with open(file_name, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        return data
+        return _load_json_cached(file_name, os.path.getmtime(file_name))
 
     def _create_tables(self):
         """
@@ -83,6 +140,18 @@ class JsonData:
         """
         return self.tables
 
+    @staticmethod
+    def _arrow_dtype(dtype):
+        """
+        Retorna o equivalente pyarrow de um tipo numérico, booleano ou texto.
+
+        Tipos sem equivalente direto (ex.: 'category') são retornados sem alteração.
+
+        :param dtype: Tipo de dados informado no arquivo JSON.
+        :return: Tipo de dados a ser usado na conversão.
+        """
+        return _ARROW_DTYPES.get(dtype, dtype)
+
     @staticmethod
     def convert_data_types(df, column_types):
         """
@@ -92,46 +161,234 @@ class JsonData:
         :param column_types: Dicionário contendo mapeamento de colunas para tipos de dados.
         :return: DataFrame com tipos de dados convertidos.
         """
-        return df.astype(column_types)
+        geometry = df.geometry.name if isinstance(df, gpd.GeoDataFrame) else None
+        for column, dtype in column_types.items():
+            if column != geometry:
+                df[column] = JsonData._cast_column(df[column], JsonData._arrow_dtype(dtype))
+        return df
+
+    @staticmethod
+    def _cast_column(series, dtype):
+        """
+        Converte uma coluna para o tipo informado.
+
+        Colunas de texto com destino numérico (ex.: TIP_CND e TEN_PRI, gravadas como texto na base)
+        são primeiro interpretadas como números, pois o pyarrow não converte texto diretamente em
+        tipos numéricos.
+
+        :param series: Coluna a ser convertida.
+        :param dtype: Tipo de dados de destino, conforme ``_arrow_dtype``.
+        :return: Coluna convertida.
+        """
+        target = pd.api.types.pandas_dtype(dtype)
+        if _is_arrow_numeric(target) and not (_is_arrow_numeric(series.dtype)
+                                              or pd.api.types.is_numeric_dtype(series.dtype)):
+            series = pd.to_numeric(series)
+        return series.astype(target, copy=False)
+
+    @staticmethod
+    def _source_mtime(file_name):
+        """
+        Retorna a data de modificação mais recente entre a base e todos os arquivos contidos nela.
+
+        A data do diretório .gdb não muda quando um arquivo interno é reescrito, por isso todos os
+        arquivos são considerados.
+
+        :param file_name: Nome do arquivo (ou diretório) de entrada.
+        :return: Data de modificação mais recente, em nanossegundos.
+        """
+        mtime = os.stat(file_name).st_mtime_ns
+        for root, _, files in os.walk(file_name):
+            for name in files:
+                mtime = max(mtime, os.stat(os.path.join(root, name)).st_mtime_ns)
+        return mtime
+
+    @staticmethod
+    def _sidecar_path(file_name, layer, source_mtime, cache_dir=None):
+        """
+        Retorna o caminho do arquivo GeoParquet de uma camada.
+
+        A data de modificação da base faz parte do nome, para que uma base alterada, restaurada ou
+        descompactada nunca reutilize um arquivo gerado a partir de outra versão.
+
+        :param file_name: Nome do arquivo de entrada.
+        :param layer: Nome da camada.
+        :param source_mtime: Data de modificação da base, conforme ``_source_mtime``.
+        :param cache_dir: Diretório dos arquivos .parquet (padrão: None, ao lado da base).
+        :return: Caminho do arquivo .parquet da camada.
+        """
+        source = os.path.normpath(file_name)
+        cache_dir = cache_dir or os.path.dirname(source)
+        return os.path.join(cache_dir, f"{os.path.basename(source)}.{layer}.{source_mtime}.parquet")
+
+    @staticmethod
+    def _ensure_parquet(file_name, layer, sidecar):
+        """
+        Converte a camada para GeoParquet na primeira utilização e retorna o caminho do arquivo gerado.
+
+        O arquivo é escrito em um arquivo temporário e movido para ``sidecar`` ao final, para que uma
+        escrita interrompida não deixe um arquivo incompleto. Arquivos de versões anteriores da mesma
+        camada são removidos.
+
+        :param file_name: Nome do arquivo de entrada.
+        :param layer: Nome da camada a ser convertida.
+        :param sidecar: Caminho do arquivo .parquet, conforme ``_sidecar_path``.
+        :return: Caminho do arquivo .parquet da camada, ou None se o diretório do cache não puder
+                 ser escrito.
+        """
+        if os.path.exists(sidecar):
+            return sidecar
+
+        cache_dir, name = os.path.split(sidecar)
+        prefix = name[:name.rindex('.', 0, name.rindex('.')) + 1]
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=prefix, suffix='.parquet.tmp')
+        except OSError:
+            return None
+        os.close(fd)
+        try:
+            pyogrio.read_dataframe(file_name, layer=layer, use_arrow=True).to_parquet(tmp)
+            os.replace(tmp, sidecar)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+        for entry in os.scandir(cache_dir):
+            if entry.name.startswith(prefix) and entry.name.endswith('.parquet') and entry.name != name:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+        return sidecar
+
+    def _read_table(self, file_name, table, has_geometry, sidecar):
+        """
+        Lê as colunas da tabela a partir do arquivo GeoParquet da camada.
+
+        Se o cache não puder ser escrito (ex.: base instalada em um local somente leitura), a camada
+        é lida diretamente da base.
+
+        :param file_name: Nome do arquivo de entrada.
+        :param table: Tabela a ser lida.
+        :param has_geometry: Indica se a camada de origem possui geometria.
+        :param sidecar: Caminho do arquivo .parquet da camada.
+        :return: DataFrame (ou GeoDataFrame) com as colunas da tabela.
+        """
+        sidecar = self._ensure_parquet(file_name, table.name, sidecar)
+        if sidecar is None:
+            return pyogrio.read_dataframe(file_name, layer=table.name, columns=table.columns,
+                                          read_geometry=not table.ignore_geometry, use_arrow=True)
+
+        # Colunas configuradas que a camada não possui são ignoradas, como faz o pyogrio
+        available = set(pq.read_schema(sidecar).names)
+        columns = [column for column in table.columns if column in available]
+        if table.ignore_geometry or not has_geometry:
+            # Mantém as colunas nos buffers do Arrow, sem cópia para numpy
+            return pq.read_table(sidecar, columns=columns).to_pandas(types_mapper=pd.ArrowDtype)
+        return gpd.read_parquet(sidecar, columns=columns + ['geometry'])
+
+    def _cast_table(self, gdf_, table):
+        """
+        Converte apenas as colunas cujo tipo difere do tipo configurado para a tabela.
+
+        :param gdf_: DataFrame lido da camada.
+        :param table: Tabela correspondente.
+        :return: DataFrame com tipos de dados convertidos.
+        """
+        to_cast = {c: t for c, t in table.data_types.items()
+                   if gdf_.dtypes.get(c) != self._arrow_dtype(t)}
+        return self.convert_data_types(gdf_, to_cast) if to_cast else gdf_
 
-    def create_geodataframes(self, file_name, runs=1):
+    def _load_table(self, file_name, table, has_geometry, sidecar):
         """
-        Cria GeoDataFrames a partir de um arquivo de entrada e coleta estatísticas.
+        Carrega e converte uma tabela.
 
         :param file_name: Nome do arquivo de entrada.
-        :param runs: Número de vezes que cada tabela será carregada e convertida (padrão: 1).
-        :return: Dicionário contendo GeoDataFrames e estatísticas.
+        :param table: Tabela a ser carregada.
+        :param has_geometry: Indica se a camada de origem possui geometria.
+        :param sidecar: Caminho do arquivo .parquet da camada.
+        :return: Dicionário contendo o GeoDataFrame da tabela.
         """
-        geodataframes = {}
+        return {
+            'gdf': self._cast_table(self._read_table(file_name, table, has_geometry, sidecar), table),
+            'ignore_geometry': table.ignore_geometry
+        }
+
+    def _load_table_timed(self, file_name, table, has_geometry, sidecar, runs):
+        """
+        Carrega e converte uma tabela ``runs`` vezes, coletando estatísticas.
 
-        for table_name, table in self.tables.items():
-            load_times = []
-            conversion_times = []
-            gdf_converted = None
+        O arquivo GeoParquet da camada é gerado antes da primeira medição, para que a conversão
+        inicial não entre nos tempos.
 
-            for _ in range(runs):
-                start_time = time.time()
-                gdf_ = gpd.read_file(file_name, layer=table.name, include_fields=table.columns,
-                                     ignore_geometry=table.ignore_geometry)
-                start_conversion_time = time.time()
-                gdf_converted = self.convert_data_types(gdf_, table.data_types)
-                end_time = time.time()
+        :param file_name: Nome do arquivo de entrada.
+        :param table: Tabela a ser carregada.
+        :param has_geometry: Indica se a camada de origem possui geometria.
+        :param sidecar: Caminho do arquivo .parquet da camada.
+        :param runs: Número de vezes que a tabela será carregada e convertida.
+        :return: Dicionário contendo o GeoDataFrame e estatísticas da tabela.
+        """
+        self._ensure_parquet(file_name, table.name, sidecar)
 
-                load_times.append(start_conversion_time - start_time)
-                conversion_times.append(end_time - start_conversion_time)
+        load_times = []
+        conversion_times = []
+        gdf_converted = None
 
-            load_time_avg = sum(load_times) / len(load_times)
-            conversion_time_avg = sum(conversion_times) / len(conversion_times)
-            mem_usage = gdf_converted.memory_usage(index=True, deep=True).sum() / 1024 ** 2
+        for _ in range(runs):
+            start_time = time.perf_counter_ns()
+            gdf_ = self._read_table(file_name, table, has_geometry, sidecar)
+            start_conversion_time = time.perf_counter_ns()
+            gdf_converted = self._cast_table(gdf_, table)
+            end_time = time.perf_counter_ns()
+
+            load_times.append(start_conversion_time - start_time)
+            conversion_times.append(end_time - start_conversion_time)
+
+        load_time_avg = sum(load_times) / len(load_times) / 1e9
+        conversion_time_avg = sum(conversion_times) / len(conversion_times) / 1e9
+        mem_usage = gdf_converted.memory_usage(index=True, deep=True).sum() / 1024 ** 2
+
+        return {
+            'gdf': gdf_converted,
+            'memory_usage': mem_usage,
+            'load_time_avg': load_time_avg,
+            'conversion_time_avg': conversion_time_avg,
+            'ignore_geometry': table.ignore_geometry
+        }
+
+    def create_geodataframes(self, file_name, runs=None, cache_dir=None):
+        """
+        Cria GeoDataFrames a partir de um arquivo de entrada.
+
+        As tabelas são carregadas em paralelo, uma por thread. Quando ``runs`` é informado, as
+        tabelas são carregadas uma de cada vez, para que os tempos medidos não incluam a disputa
+        entre threads, e estatísticas de tempo e memória são coletadas.
+
+        :param file_name: Nome do arquivo de entrada.
+        :param runs: Número de vezes que cada tabela será carregada e convertida para coleta de
+                     estatísticas (padrão: None, sem estatísticas).
+        :param cache_dir: Diretório dos arquivos GeoParquet gerados (padrão: None, ao lado da base).
+        :return: Dicionário contendo GeoDataFrames e, se solicitado, estatísticas.
+        """
+        # Lista as camadas uma única vez, para falhar antes de ler qualquer tabela
+        layers = dict(pyogrio.list_layers(file_name))
+        missing = [table.name for table in self.tables.values() if table.name not in layers]
+        if missing:
+            raise ValueError(f"Camadas não encontradas em {file_name}: {', '.join(missing)}")
+
+        source_mtime = self._source_mtime(file_name)
+        jobs = {
+            table_name: (file_name, table, layers[table.name] is not None,
+                         self._sidecar_path(file_name, table.name, source_mtime, cache_dir))
+            for table_name, table in self.tables.items()
+        }
+        if runs is not None:
+            return {table_name: self._load_table_timed(*job, runs) for table_name, job in jobs.items()}
 
-            geodataframes[table_name] = {
-                'gdf': gdf_converted,
-                'memory_usage': mem_usage,
-                'load_time_avg': load_time_avg,
-                'conversion_time_avg': conversion_time_avg,
-                'ignore_geometry': table.ignore_geometry
-            }
-        return geodataframes
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(self.tables)))) as executor:
+            futures = {table_name: executor.submit(self._load_table, *job) for table_name, job in jobs.items()}
+        return {table_name: future.result() for table_name, future in futures.items()}
 
 
 def get_caller_directory(caller_frame: inspect) -> pathlib.Path:
@@ -157,7 +414,7 @@ def run_gui(folder_bdgd: str) -> None:
     gui.load_window()
 
 
-def run(folder: Optional[str] = None) -> None:
+def run(folder: Optional[str] = None, cache_dir: Optional[str] = None) -> None:
     case = Case()
     s = Sample()
     folder_bdgd = folder or s.mux_energia
@@ -165,13 +422,11 @@ def run(folder: Optional[str] = None) -> None:
 
     json_data = JsonData(json_file_name)
 
-    geodataframes = json_data.create_geodataframes(folder_bdgd)
+    geodataframes = json_data.create_geodataframes(folder_bdgd, cache_dir=cache_dir)
     case.dfs = geodataframes
 
     case.circuitos = Circuit.create_circuit_from_json(json_data.data, case.dfs['CTMT']['gdf'])
-    for c in case.circuitos:
-        print(c)
+    print("\n".join(map(str, case.circuitos)))
 
     case.line_codes = LineCode.create_linecode_from_json(json_data.data, case.dfs['SEGCON']['gdf'])
-    for l_ in case.line_codes:
-        print(l_)
+    print("\n".join(map(str, case.line_codes)))
@@ -10,128 +10,67 @@
  * Time: 21:35
 """
 # Não remover a linha de importação abaixo
-import copy
-import re
-from typing import Any
-import geopandas as gpd
+from typing import TYPE_CHECKING, Any
 from tqdm import tqdm
 
+if TYPE_CHECKING:
+    import geopandas as gpd
+
 from bdgd_tools.model.Converter import convert_tpotrtv, convert_tfascon_phases, convert_tfascon_conn, convert_tfascon_bus #, convert_tgruten
+from bdgd_tools.model.Converter import resolve_config
 # fazer função convert_tgruten
 
-from dataclasses import dataclass
+_CAPACITOR_TMPL = ('New "Capacitor.{capacitor}" kv={kv} '
+                   'kvar={kvar} bus1="{bus1}" phases={phases} '
+                   'conn={conn}')
+
 
-@dataclass
 class Capacitor:
-    _capacitor: str = ""
-    _bus1: str = ""
-    _kv: float = 0.0
-    _kvar: float = 0.0
-    _phases: int = 0
-    _conn: str = ""
-    _bus_nodes: str = ""
-
-    @property
-    def capacitor(self):
-        return self._capacitor
-
-    @capacitor.setter
-    def capacitor(self, value: str):
-        self._capacitor = value        
-        
-    @property
-    def bus1(self) -> str:
-        return self._bus1
-
-    @bus1.setter
-    def bus1(self, value):
-        self._bus1 = value
-        
-    @property
-    def kv(self):
-        return self._kv
-
-    @kv.setter
-    def kv(self, value: float):
-        self._kv = value        
-
-    @property
-    def kvar(self):
-        return self._kvar
-
-    @kvar.setter
-    def kvar(self, value: float):
-        self._kvar = value
-
-    @property
-    def phases(self):
-        return self._phases
-
-    @phases.setter
-    def phases(self, value: int):
-        self._phases = value
-
-    @property
-    def conn(self) -> str:
-        return self._conn
-
-    @conn.setter
-    def conn(self, value):
-        self._conn = value
-        
-    @property
-    def bus_nodes(self) -> str:
-        return self._bus_nodes
-
-    @bus_nodes.setter
-    def bus_nodes(self, value):
-        self._bus_nodes = value
-        
-     
+    __slots__ = ("capacitor", "bus1", "kv", "kvar", "phases", "conn", "bus_nodes")
+
+    def __init__(self, capacitor: str = "", bus1: str = "", kv: float = 0.0, kvar: float = 0.0, phases: int = 0,
+                 conn: str = "", bus_nodes: str = ""):
+        self.capacitor = capacitor
+        self.bus1 = bus1
+        self.kv = kv
+        self.kvar = kvar
+        self.phases = phases
+        self.conn = conn
+        self.bus_nodes = bus_nodes
+
     def full_string(self) -> str:
-        return f"New \"Capacitor.{self.capacitor}\" kv={self.kv} " \
-               f"kvar={self.kvar} bus1=\"{self.bus1}\" phases={self.phases} " \
-               f"conn={self.conn}"
+        return _CAPACITOR_TMPL.format(capacitor=self.capacitor, kv=self.kv, kvar=self.kvar, bus1=self.bus1,
+                                      phases=self.phases, conn=self.conn)
 
     def __repr__(self):
-        return f"New \"Capacitor.{self.capacitor}\" kv={self.kv} " \
-               f"kvar={self.kvar} bus1=\"{self.bus1}\" phases={self.phases} " \
-               f"conn={self.conn}"
+        return self.full_string()
 
 
     @staticmethod
-    def _create_capacitor_from_row(capacitor_config, row):
+    def _create_capacitor_from_row(static_items, column_items, i):
         capacitor_ = Capacitor()
 
-        for key, value in capacitor_config.items():
-            if key == "static":
-                for static_key, static_value in value.items():
-                    setattr(capacitor_, f"_{static_key}", static_value)
-            elif key == "direct_mapping":
-                for mapping_key, mapping_value in value.items():
-                    setattr(capacitor_, f"_{mapping_key}", row[mapping_value])
-            elif key == "indirect_mapping":
-                for mapping_key, mapping_value in value.items():
-                    if isinstance(mapping_value, list):
-                        param_name, function_name = mapping_value
-                        function_ = globals()[function_name]
-                        param_value = row[param_name]
-                        setattr(capacitor_, f"_{mapping_key}", function_(param_value))
-                    else:
-                        setattr(capacitor_, f"_{mapping_key}", row[mapping_value])
+        for attribute, value in static_items:
+            setattr(capacitor_, attribute, value)
+        for attribute, values in column_items:
+            setattr(capacitor_, attribute, values[i])
 
         return capacitor_
 
     @staticmethod
-    def create_capacitor_from_json(json_data: Any, dataframe: gpd.geodataframe.GeoDataFrame):
+    def create_capacitor_from_json(json_data: Any, dataframe: "gpd.geodataframe.GeoDataFrame"):
         capacitors = []
         capacitor_config = json_data['elements']['Capacitor']['UNCRMT']
 
-        progress_bar = tqdm(dataframe.iterrows(), total=len(dataframe), desc="capacitor", unit=" capacitors", ncols=100)
-        for _, row in progress_bar:
-            capacitor_ = capacitor._create_capacitor_from_row(capacitor_config, row)
+        static_items, column_items = resolve_config(capacitor_config, dataframe, globals())
+
+        last_row = len(dataframe) - 1
+        progress_bar = tqdm(range(len(dataframe)), desc="capacitor", unit=" capacitors", ncols=100, mininterval=0.5)
+        for i in progress_bar:
+            capacitor_ = Capacitor._create_capacitor_from_row(static_items, column_items, i)
 
             capacitors.append(capacitor_)
-            progress_bar.set_description(f"Processing Capacitor {_ + 1}")
+            if (i & 1023) == 0 or i == last_row:
+                progress_bar.set_description(f"Processing Capacitor {i + 1}")
 
         return capacitors
\ No newline at end of file
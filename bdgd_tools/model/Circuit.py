@@ -10,11 +10,13 @@
  * Time: 22:42
 """
 # Não remover a linha de importação abaixo
-from typing import Any, List
-import geopandas as gpd
+from typing import TYPE_CHECKING, Any, List
 from tqdm import tqdm
 
-from bdgd_tools.model.Converter import convert_tten
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+from bdgd_tools.model.Converter import convert_tten, resolve_config
 
 from dataclasses import dataclass
 
@@ -90,69 +92,23 @@ class Circuit:
                f"bus1=\"{self.bus1}\" r1={self.r1} x1={self.x1}"
 
     @staticmethod
-    def _process_static(circuit_, value):
-        """
-        Static method to process the static configuration for a Circuit object.
-
-        Args:
-            circuit_ (object): A Circuit object being updated.
-            value (dict): A dictionary containing the static configuration.
-
-        This method processes the static configuration by iterating through the
-        key-value pairs of the 'value' dictionary and directly setting the
-        corresponding attribute on the Circuit object with the static value.
-        """
-        for static_key, static_value in value.items():
-            setattr(circuit_, f"_{static_key}", static_value)
-
-    @staticmethod
-    def _process_direct_mapping(circuit_, value, row):
-        """
-        Static method to process the direct mapping configuration for a Circuit object.
-
-        Args:
-            circuit_ (object): A Circuit object being updated.
-            value (dict): A dictionary containing the direct mapping configuration.
-            row (pd.Series): A row from the GeoDataFrame containing circuit-related data.
-
-        This method processes the direct mapping configuration by iterating through the
-        key-value pairs of the 'value' dictionary and directly setting the corresponding
-        attribute on the Circuit object using the value from the row.
-        """
-        for mapping_key, mapping_value in value.items():
-            setattr(circuit_, f"_{mapping_key}", row[mapping_value])
-
-    @staticmethod
-    def _process_indirect_mapping(circuit_, value, row):
+    def _apply(circuit_, i, static_items, column_items):
         """
-        Static method to process the indirect mapping configuration for a Circuit object.
+        Static method to set the attributes of a Circuit object from the resolved configuration.
 
         Args:
             circuit_ (object): A Circuit object being updated.
-            value (dict): A dictionary containing the indirect mapping configuration.
-            row (pd.Series): A row from the GeoDataFrame containing circuit-related data.
-
-        This method processes the indirect mapping configuration by iterating through the
-        key-value pairs of the 'value' dictionary. If the value is a list, it treats the
-        first element as a parameter name and the second element as a function name. The
-        method then retrieves the parameter value from the row and calls the specified
-        function with that parameter value. The result is then set as an attribute on the
-        Circuit object.
-
-        If the value is not a list, the method directly sets the corresponding attribute on
-        the Circuit object using the value from the row.
+            i (int): The position of the row in the GeoDataFrame.
+            static_items (list): (attribute, value) pairs from the static configuration.
+            column_items (list): (attribute, values) pairs from the mapped configurations.
         """
-        for mapping_key, mapping_value in value.items():
-            if isinstance(mapping_value, list):
-                param_name, function_name = mapping_value
-                function_ = globals()[function_name]
-                param_value = row[param_name]
-                setattr(circuit_, f"_{mapping_key}", function_(param_value))
-            else:
-                setattr(circuit_, f"_{mapping_key}", row[mapping_value])
+        for attribute, value in static_items:
+            setattr(circuit_, attribute, value)
+        for attribute, values in column_items:
+            setattr(circuit_, attribute, values[i])
 
     @classmethod
-    def create_circuit_from_json(cls, json_data: Any, dataframe: gpd.geodataframe.GeoDataFrame) -> List:
+    def create_circuit_from_json(cls, json_data: Any, dataframe: "gpd.geodataframe.GeoDataFrame") -> List:
         """
         Class method to create a list of Circuit objects from JSON data and a GeoDataFrame.
 
@@ -164,9 +120,9 @@ class Circuit:
         Returns:
             List[cls]: A list of Circuit objects created from the given JSON data and GeoDataFrame.
 
-        This method iterates through the rows of the given GeoDataFrame, processes the JSON data,
-        and creates Circuit objects accordingly. It updates the progress bar description with the
-        current circuit number being processed.
+        This method computes the mapped values for whole columns of the given GeoDataFrame at once,
+        then creates one Circuit object per row from those values. It updates the progress bar
+        description with the current circuit number being processed.
 
         The JSON data must have the following structure:
             {
@@ -181,24 +137,20 @@ class Circuit:
                 }
             }
 
-        The keys "direct_mapping", "indirect_mapping", and "static" are used to determine
-        how to process each row in the GeoDataFrame and update the Circuit objects accordingly.
+        The keys "direct_mapping", "indirect_mapping", and "static" are resolved once, before the
+        rows are processed, and then applied to each Circuit object.
         """
         circuits = []
         circuit_config = json_data['elements']['Circuit']['CTMT']
 
-        progress_bar = tqdm(dataframe.iterrows(), total=len(dataframe), desc="Circuit", unit=" circuits", ncols=100)
-        for _, row in progress_bar:
-            circuit_ = cls()
+        static_items, column_items = resolve_config(circuit_config, dataframe, globals(), prefix="_")
 
-            for key, value in circuit_config.items():
-                if key == "direct_mapping":
-                    cls._process_direct_mapping(circuit_, value, row)
-                elif key == "indirect_mapping":
-                    cls._process_indirect_mapping(circuit_, value, row)
-
-                elif key == "static":
-                    cls._process_static(circuit_, value)
+        last_row = len(dataframe) - 1
+        progress_bar = tqdm(range(len(dataframe)), desc="Circuit", unit=" circuits", ncols=100, mininterval=0.5)
+        for i in progress_bar:
+            circuit_ = cls()
+            cls._apply(circuit_, i, static_items, column_items)
             circuits.append(circuit_)
-            progress_bar.set_description(f"Processing Circuit {_+1}")
+            if (i & 1023) == 0 or i == last_row:
+                progress_bar.set_description(f"Processing Circuit {i + 1}")
         return circuits
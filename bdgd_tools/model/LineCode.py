@@ -10,93 +10,39 @@
  * Time: 23:53
 """
 # Não remover a linha de importação abaixo
-import copy
 import re
-from typing import Any
-import geopandas as gpd
+from typing import TYPE_CHECKING, Any
 from tqdm import tqdm
 
-from bdgd_tools.model.Converter import convert_tten
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+from bdgd_tools.model.Converter import convert_tten, resolve_config
 #from bdgd_tools.model.Converter import convert_tten
 
 from dataclasses import dataclass
 
+_LINECODE_TMPL = ('New "Linecode.{linecode}" nphases={nphases} '
+                  'basefreq={basefreq} r1="{r1}" x1={x1} '
+                  'units={units} normamps={normamps}')
+
 
 @dataclass
 class LineCode:
-    _basefreq: float = 60
-    _units: str = "km"
-    _linecode: str = ""
-    _nphases: int = 4
-    _normamps: float = 520.00
-    _r1: float = 0.0000
-    _x1: float = 0.0001
-
-    @property
-    def basefreq(self):
-        return self._basefreq
-
-    @basefreq.setter
-    def basefreq(self, value: float):
-        self._basefreq = value
-
-    @property
-    def units(self):
-        return self._units
-
-    @units.setter
-    def units(self, value: str):
-        self._units = value
-
-    @property
-    def linecode(self):
-        return self._linecode
-
-    @linecode.setter
-    def linecode(self, value: str):
-        self._linecode = value
-
-    @property
-    def nphases(self):
-        return self._nphases
-
-    @nphases.setter
-    def nphases(self, value: int):
-        self._nphases = value
-
-    @property
-    def normamps(self):
-        return self._normamps
-
-    @normamps.setter
-    def normamps(self, value: float):
-        self._normamps = value
-
-    @property
-    def r1(self):
-        return self._r1
-
-    @r1.setter
-    def r1(self, value: float):
-        self._r1 = value
-
-    @property
-    def x1(self):
-        return self._x1
-
-    @x1.setter
-    def x1(self, value: float):
-        self._x1 = value
+    basefreq: float = 60
+    units: str = "km"
+    linecode: str = ""
+    nphases: int = 4
+    normamps: float = 520.00
+    r1: float = 0.0000
+    x1: float = 0.0001
 
     def full_string(self) -> str:
-        return f"New \"Linecode.{self.linecode}\" nphases={self.nphases} " \
-               f"basefreq={self.basefreq} r1=\"{self.r1}\" x1={self.x1} " \
-               f"units={self.units} normamps={self.normamps}"
+        return _LINECODE_TMPL.format(linecode=self.linecode, nphases=self.nphases, basefreq=self.basefreq,
+                                     r1=self.r1, x1=self.x1, units=self.units, normamps=self.normamps)
 
     def __repr__(self):
-        return f"New \"Linecode.{self.linecode}\" nphases={self.nphases} " \
-               f"basefreq={self.basefreq} r1=\"{self.r1}\" x1={self.x1} " \
-               f"units={self.units} normamps={self.normamps}"
+        return self.full_string()
 
     @staticmethod
     def rename_linecode_string(input_str: str) -> str:
@@ -110,46 +56,37 @@ class LineCode:
         return re.sub(pattern, repl, input_str)
 
     @staticmethod
-    def _create_linecode_from_row(linecode_config, row):
+    def _create_linecode_from_row(static_items, column_items, i):
         linecode_ = LineCode()
 
-        for key, value in linecode_config.items():
-            if key == "static":
-                for static_key, static_value in value.items():
-                    setattr(linecode_, f"_{static_key}", static_value)
-            elif key == "direct_mapping":
-                for mapping_key, mapping_value in value.items():
-                    setattr(linecode_, f"_{mapping_key}", row[mapping_value])
-            elif key == "indirect_mapping":
-                for mapping_key, mapping_value in value.items():
-                    if isinstance(mapping_value, list):
-                        param_name, function_name = mapping_value
-                        function_ = globals()[function_name]
-                        param_value = row[param_name]
-                        setattr(linecode_, f"_{mapping_key}", function_(param_value))
-                    else:
-                        setattr(linecode_, f"_{mapping_key}", row[mapping_value])
+        for attribute, value in static_items:
+            setattr(linecode_, attribute, value)
+        for attribute, values in column_items:
+            setattr(linecode_, attribute, values[i])
 
         return linecode_
 
     @staticmethod
-    def create_linecode_from_json(json_data: Any, dataframe: gpd.geodataframe.GeoDataFrame):
+    def create_linecode_from_json(json_data: Any, dataframe: "gpd.geodataframe.GeoDataFrame"):
         linecodes = []
         linecode_config = json_data['elements']['Linecode']['SEGCON']
         interactive = linecode_config.get('interactive')
 
-        progress_bar = tqdm(dataframe.iterrows(), total=len(dataframe), desc="Linecode", unit=" linecodes", ncols=100)
-        for _, row in progress_bar:
-            linecode_ = LineCode._create_linecode_from_row(linecode_config, row)
+        static_items, column_items = resolve_config(linecode_config, dataframe, globals())
+
+        last_row = len(dataframe) - 1
+        progress_bar = tqdm(range(len(dataframe)), desc="Linecode", unit=" linecodes", ncols=100, mininterval=0.5)
+        for i in progress_bar:
+            linecode_ = LineCode._create_linecode_from_row(static_items, column_items, i)
 
             if interactive is not None:
-                for i in range(1, interactive['nphases'] + 1):
-                    new_linecode = copy.deepcopy(linecode_)
-                    new_linecode.nphases = i
-                    new_linecode = LineCode.rename_linecode_string(new_linecode.full_string())
-                    linecodes.append(new_linecode)
+                # linecode_ só é usado para gerar as strings, então pode ser reaproveitado para cada nphases
+                for nphases in range(1, interactive['nphases'] + 1):
+                    linecode_.nphases = nphases
+                    linecodes.append(LineCode.rename_linecode_string(linecode_.full_string()))
             else:
                 linecodes.append(linecode_)
-            progress_bar.set_description(f"Processing Linecode {_ + 1}")
+            if (i & 1023) == 0 or i == last_row:
+                progress_bar.set_description(f"Processing Linecode {i + 1}")
 
         return linecodes
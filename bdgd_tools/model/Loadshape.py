@@ -10,13 +10,13 @@
  * Time: 11:11
 """
 # Não remover a linha de importação abaixo
-import copy
-import re
-from typing import Any
-import geopandas as gpd
+from typing import TYPE_CHECKING, Any
 from tqdm import tqdm
 import numpy as np
 
+if TYPE_CHECKING:
+    import geopandas as gpd
+
 from bdgd_tools.model.Converter import process_loadshape
 
 from dataclasses import dataclass
@@ -87,12 +87,11 @@ class Loadshape:
                f"{self.interval} mult=({self.loadshape_str})"
 
     def __repr__(self):
-        return f"New \"Loadshape.{self.tipocc}_{self.tipodia}\" {self.npts} " \
-               f"{self.interval} mult=({self.loadshape_str})"
+        return self.full_string()
     
     
     @staticmethod
-    def compute_loadshape_curve(dataframe: gpd.geodataframe.GeoDataFrame):
+    def compute_loadshape_curve(dataframe: "gpd.geodataframe.GeoDataFrame"):
         for i in range(0,len(dataframe)):
             mult_list = process_loadshape(dataframe.filter(regex='^POT').loc[i,:].to_list())
             dataframe.loc[i,'loadshape_str'] = str(list(np.round(mult_list,6)))
@@ -131,7 +130,7 @@ class Loadshape:
         return loadshape_
 
     @staticmethod
-    def create_loadshape_from_json(json_data: Any, dataframe: gpd.geodataframe.GeoDataFrame):
+    def create_loadshape_from_json(json_data: Any, dataframe: "gpd.geodataframe.GeoDataFrame"):
         loadshapes = []
         loadshape_config = json_data['elements']['Loadshape']['CRVCRG']
         calculated = loadshape_config.get('calculated')
@@ -139,11 +138,14 @@ class Loadshape:
         if calculated is not None:
             new_dataframe = Loadshape.compute_loadshape_curve(dataframe)
 
-        progress_bar = tqdm(new_dataframe.iterrows(), total=len(new_dataframe), desc="Loadshape", unit="loadshapes", ncols=100)
-        for _, row in progress_bar:
+        last_row = len(new_dataframe) - 1
+        progress_bar = tqdm(new_dataframe.iterrows(), total=len(new_dataframe), desc="Loadshape", unit="loadshapes", ncols=100,
+                            mininterval=0.5)
+        for i, (_, row) in enumerate(progress_bar):
             loadshape_ = Loadshape._create_loadshape_from_row(loadshape_config, row) ####
             loadshapes.append(loadshape_)
 
-            progress_bar.set_description(f"Processing Loadshape {_ + 1}")
+            if (i & 1023) == 0 or i == last_row:
+                progress_bar.set_description(f"Processing Loadshape {i + 1}")
 
         return loadshapes
\ No newline at end of file
@@ -2,8 +2,21 @@
 
 """Tests for `bdgd_tools` package."""
 
+import os
+import shutil
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyogrio
 import pytest
 
+from bdgd_tools import Sample
+from bdgd_tools.core.Core import JsonData, Table
+from bdgd_tools.model.Converter import map_unique, resolve_config
+
+JSON_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bdgd2dss.json")
+
 
 @pytest.fixture
 def response():
@@ -16,3 +29,152 @@ def response():
 def test_content(response):
     """Sample pytest test function with the pytest fixture as an argument."""
 
+
+@pytest.fixture
+def bdgd_copy(tmp_path):
+    """Copy of the sample BDGD whose file times can be changed freely."""
+    return shutil.copytree(Sample().mux_energia, str(tmp_path / "muxenergia.gdb"))
+
+
+def test_parquet_cache_follows_source_mtime(bdgd_copy, tmp_path):
+    """A source with another mtime, newer or older, gets a new sidecar and the stale one is removed."""
+    cache_dir = str(tmp_path / "cache")
+    json_data = JsonData(JSON_FILE)
+    json_data.create_geodataframes(bdgd_copy, cache_dir=cache_dir)
+    first = sorted(os.listdir(cache_dir))
+    assert len(first) == len(json_data.get_tables())
+
+    mtime = JsonData._source_mtime(bdgd_copy)
+    seen = set(first)
+    # A file rewritten inside the base, then the whole base restored with older timestamps
+    for new_mtime, names in ((mtime + 10 ** 10, sorted(os.listdir(bdgd_copy))[:1]),
+                             (mtime - 10 ** 12, os.listdir(bdgd_copy))):
+        for name in names:
+            os.utime(os.path.join(bdgd_copy, name), ns=(new_mtime, new_mtime))
+        os.utime(bdgd_copy, ns=(new_mtime, new_mtime))
+        json_data.create_geodataframes(bdgd_copy, cache_dir=cache_dir)
+        current = sorted(os.listdir(cache_dir))
+        assert len(current) == len(first)
+        assert seen.isdisjoint(current)
+        seen.update(current)
+
+
+def test_parquet_cache_interrupted_write(tmp_path, monkeypatch):
+    """A conversion that fails halfway leaves neither a sidecar nor a temporary file behind."""
+    def broken_to_parquet(self, path, *args, **kwargs):
+        with open(path, 'wb') as file:
+            file.write(b'PAR1')
+        raise RuntimeError("interrupted")
+
+    monkeypatch.setattr(gpd.GeoDataFrame, "to_parquet", broken_to_parquet)
+    cache_dir = str(tmp_path / "cache")
+    source = Sample().mux_energia
+    sidecar = JsonData._sidecar_path(source, 'SSDMT', JsonData._source_mtime(source), cache_dir)
+    with pytest.raises(RuntimeError):
+        JsonData._ensure_parquet(source, 'SSDMT', sidecar)
+    assert os.listdir(cache_dir) == []
+
+
+def test_parquet_cache_unwritable_reads_source(tmp_path):
+    """When the cache directory cannot be created, tables are read directly from the source."""
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    json_data = JsonData(JSON_FILE)
+    geodataframes = json_data.create_geodataframes(Sample().mux_energia, cache_dir=str(blocker / "cache"))
+
+    for table_name in json_data.get_tables():
+        source = pyogrio.read_dataframe(Sample().mux_energia, layer=table_name, read_geometry=False)
+        assert len(geodataframes[table_name]['gdf']) == len(source)
+
+
+def test_create_geodataframes_data_types(tmp_path):
+    """Loads the sample BDGD and checks every configured column has its configured type."""
+    json_data = JsonData(JSON_FILE)
+    geodataframes = json_data.create_geodataframes(Sample().mux_energia, cache_dir=str(tmp_path))
+
+    assert geodataframes['SSDMT']['gdf']['TIP_CND'].dtype == 'uint16[pyarrow]'
+    for column in ('TEN_PRI', 'TEN_SEC', 'TEN_TER', 'POT_NOM'):
+        assert geodataframes['EQTRMT']['gdf'][column].dtype == 'uint16[pyarrow]'
+
+    for table_name, table in json_data.get_tables().items():
+        gdf = geodataframes[table_name]['gdf']
+        for column, dtype in table.data_types.items():
+            if column in gdf.columns:
+                assert gdf[column].dtype == JsonData._arrow_dtype(dtype), (table_name, column)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("True", True),
+    ("False", False),
+    (" false ", False),
+    (True, True),
+    (False, False),
+])
+def test_table_ignore_geometry(value, expected):
+    """ignore_geometry comes from the JSON as text, and "False" must not be read as true."""
+    assert Table("CTMT", [], {}, value).ignore_geometry is expected
+
+
+def test_create_geodataframes_keeps_geometry(tmp_path):
+    """Geometric layers configured with ignore_geometry "False" load their geometry."""
+    json_data = JsonData(JSON_FILE)
+    geodataframes = json_data.create_geodataframes(Sample().mux_energia, cache_dir=str(tmp_path))
+
+    for table_name in ('SSDMT', 'UNSEMT', 'UNTRMT', 'UNREMT', 'SSDBT'):
+        gdf = geodataframes[table_name]['gdf']
+        assert isinstance(gdf, gpd.GeoDataFrame)
+        assert gdf.geometry.notna().all()
+
+
+def test_resolve_config():
+    """Sections are resolved in order, converters come from the namespace and names get the prefix."""
+    config = {
+        "static": {"nphases": 3, "units": "km"},
+        "direct_mapping": {"linecode": "COD_ID"},
+        "indirect_mapping": {"nphases": ["FAS_CON", "phases"], "r1": "R1"},
+    }
+    dataframe = pd.DataFrame({"COD_ID": ["a", "b"], "FAS_CON": ["ABC", "AN"], "R1": [0.1, 0.2]})
+    namespace = {"phases": {"ABC": 3, "AN": 1}.get}
+
+    static_items, column_items = resolve_config(config, dataframe, namespace, prefix="_")
+
+    assert static_items == [("_units", "km")]
+    assert [(attribute, list(values)) for attribute, values in column_items] == [
+        ("_nphases", [3, 1]),
+        ("_linecode", ["a", "b"]),
+        ("_r1", [0.1, 0.2]),
+    ]
+
+
+@pytest.mark.parametrize("values", [
+    np.array(["ABC", "AN", "ABC", None, "AN", None], dtype=object),
+    pd.Categorical(["ABC", "AN", "ABC", None, "AN"]),
+    np.array([1.0, np.nan, 1.0, 2.0, np.nan]),
+    pd.array(["56", None, "56", "1"], dtype="string[pyarrow]"),
+])
+def test_map_unique(values):
+    """map_unique matches calling the converter on every element, calling it once per distinct value."""
+    calls = []
+
+    def converter(value):
+        calls.append(value)
+        return "NA" if pd.isna(value) else f"<{value}>"
+
+    expected = ["NA" if pd.isna(value) else f"<{value}>" for value in values]
+    assert list(map_unique(converter, values)) == expected
+    assert len(calls) == len(set(expected))
+
+
+def test_create_geodataframes_attribute_tables(tmp_path):
+    """Tables without geometry are read straight from Arrow and match the source layer."""
+    json_data = JsonData(JSON_FILE)
+    geodataframes = json_data.create_geodataframes(Sample().mux_energia, cache_dir=str(tmp_path))
+
+    for table_name in ('CTMT', 'SEGCON', 'CRVCRG', 'EQTRMT', 'EQRE'):
+        gdf = geodataframes[table_name]['gdf']
+        source = pyogrio.read_dataframe(Sample().mux_energia, layer=table_name, read_geometry=False)
+        assert not isinstance(gdf, gpd.GeoDataFrame)
+        assert len(gdf) == len(source)
+        assert gdf['COD_ID'].astype(str).tolist() == source['COD_ID'].astype(str).tolist()
+        unconfigured = [column for column in gdf.columns if column not in json_data.get_tables()[table_name].data_types]
+        assert all(isinstance(gdf[column].dtype, pd.ArrowDtype) for column in unconfigured)